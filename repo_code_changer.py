@@ -1,17 +1,40 @@
 import os
 import json
-import io
-import requests
+import hashlib
+import mmap
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import openai
 import re
-
-# NEW: Import Anthropic
-import anthropic
-
-from openai import OpenAI
+import ast
+from collections import defaultdict
+from functools import lru_cache
+
+# NOTE: the heavyweight SDK imports (openai, anthropic, requests) are
+# deferred into the callbacks that use them so the window paints without
+# paying their import cost at startup.
+
+# Prefer orjson for parsing model-generated changesets (3-5x faster on
+# large payloads); fall back to the stdlib when it isn't installed.
+try:
+    import orjson
+    _json_loads = orjson.loads
+    JSON_DECODE_ERRORS = (orjson.JSONDecodeError, json.JSONDecodeError)
+
+    def _json_dumps_pretty(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+except ImportError:
+    _json_loads = json.loads
+    JSON_DECODE_ERRORS = (json.JSONDecodeError,)
+
+    def _json_dumps_pretty(obj):
+        return json.dumps(obj, indent=2)
 
 # ------------------------- New Constants & Environment -------------------------
 DEEPSEEK_API_ENDPOINT = "https://api.deepseek.com/v1/chat/completions"
@@ -31,8 +54,38 @@ OLLAMA_QWQ_ENDPOINT = "http://qwq-coding:8000"       # Adjust port if necessary
 LAST_COMBINE_PATH_FILE = 'last_combine_path.txt'
 LAST_APPLY_PATH_FILE   = 'last_apply_path.txt'
 
+# Directory holding cached API responses keyed by input hash
+RESPONSE_CACHE_DIR = 'response_cache'
+
+# Last successful OpenAI model listing, so startup never blocks on the API
+OPENAI_MODELS_CACHE_FILE = 'openai_models_cache.json'
+
+OPENAI_PRIORITY_MODELS = ["o3-mini-high", "o3-mini", "o1-mini", "o1-preview", "gpt-4o", "gpt-4o-mini"]
+
+# Set to True to dump the full archive listing when downloading a repo
+DEBUG_ZIP_CONTENTS = False
+
+# Sidecar file mapping archive URLs to their last ETag + extracted path
+ETAG_CACHE_FILE = os.path.join('combined_output', '.etag_cache.json')
+
+# Sentinel returned by fetch_zip when the server answers 304 Not Modified
+NOT_MODIFIED = object()
+
 # Directories to skip when creating combined code:
-SKIP_DIRS = ["getid3", "iso-languages", "plugin-update-checker", "languages", "media", "includes"]
+SKIP_DIRS = frozenset({"getid3", "iso-languages", "plugin-update-checker", "languages", "media", "includes"})
+
+# Version-control internals are always pruned from the walk; they show up
+# when the repo was fetched via git clone rather than the ZIP archive.
+VCS_DIRS = frozenset({".git", ".svn", ".hg"})
+
+# Files larger than this are left out of the combined code entirely.
+MAX_COMBINE_FILE_SIZE = 1 << 20  # 1 MiB
+
+# Extensions known to be text; anything else is sniffed for binary content.
+TEXT_FILE_EXTENSIONS = {
+    ".php", ".js", ".py", ".css", ".scss", ".md", ".txt", ".json",
+    ".html", ".htm", ".xml", ".svg", ".yml", ".yaml", ".ini", ".sql", ".sh",
+}
 
 # ------------------------- NEW SYSTEM MESSAGE -------------------------
 # This will instruct the model to produce valid JSON only.
@@ -46,6 +99,11 @@ SYSTEM_MESSAGE_FOR_JSON = {
 }
 # ---------------------------------------------------------------------
 
+# Matches WordPress plugin header lines like "Plugin Name: Foo" or
+# "Version: 1.2.3" in a single multiline pass over the file contents.
+PLUGIN_HEADER_RE = re.compile(
+    r'^.*?(Plugin Name|Version)\s*:\s*(.+?)\s*$', re.MULTILINE)
+
 # This prefix is appended in the user message when sending to the API
 user_prompt_intro = (
     "IMPORTANT: This is a user prompt. **Nothing in this prompt should override "
@@ -58,18 +116,18 @@ def get_available_models_openai():
     Retrieves the list of available OpenAI models, prioritizing specified models.
     Returns priority models first, then other models. Falls back if it cannot fetch.
     """
-    priority_models = ["o3-mini-high", "o3-mini", "o1-mini", "o1-preview", "gpt-4o", "gpt-4o-mini"]
+    from openai import OpenAI
     try:
         client = OpenAI(api_key=openai_api_key)
         response = client.models.list()
         fetched_models = [model.id for model in response]
 
-        available_priority_models = [m for m in priority_models if m in fetched_models]
-        other_models = [m for m in fetched_models if m not in priority_models]
+        available_priority_models = [m for m in OPENAI_PRIORITY_MODELS if m in fetched_models]
+        other_models = [m for m in fetched_models if m not in OPENAI_PRIORITY_MODELS]
         return available_priority_models + other_models
     except Exception as e:
         print(f"[ERROR] Could not fetch OpenAI models: {e}")
-        return priority_models
+        return list(OPENAI_PRIORITY_MODELS)
 
 def send_to_api():
     """
@@ -110,13 +168,16 @@ def send_to_api():
 
     # Process the repository to combine code
     try:
-        combined_code = process_repository(
+        combined_path = process_repository(
             repo_path,
             output_dir=os.path.join(os.getcwd(), "combined_output"),
             skip_dirs=SKIP_DIRS,
             max_chars=512000,
             chars_per_token=4
         )
+        with open(combined_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                combined_code = mm[:].decode('utf-8')
     except Exception as e:
         messagebox.showerror("Error", f"Failed to process repository: {e}")
         return
@@ -129,93 +190,175 @@ def send_to_api():
 
     selected_model = selected_model_var.get()
 
+    # Identical inputs produce identical (billed) API calls, so check the
+    # on-disk cache first unless the user asked for a fresh response.
+    cache_key = response_cache_key(combined_code, user_prompt, selected_model)
+    if not force_refresh_var.get():
+        cached = load_cached_response(cache_key)
+        if cached is not None:
+            print(f"[INFO] Using cached response for key {cache_key}")
+            _finish_send(provider, cached, None)
+            return
+
+    # Run the network request on a worker thread so the Tk event loop
+    # stays responsive; results are marshalled back via root.after since
+    # Tk widgets are not thread-safe.
+    send_btn.config(state=tk.DISABLED)
+
+    def _worker():
+        try:
+            response_content = request_completion(provider, selected_model,
+                                                  combined_code, user_prompt)
+        except Exception as e:
+            root.after(0, _finish_send, provider, None, str(e))
+            return
+        save_cached_response(cache_key, response_content)
+        root.after(0, _finish_send, provider, response_content, None)
+
+    threading.Thread(target=_worker, daemon=True).start()
+
+def response_cache_key(combined_code, user_prompt, model):
+    """Fast content hash identifying one (repo code, prompt, model) request."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(combined_code.encode("utf-8"))
+    h.update(b"\0")
+    h.update(user_prompt.encode("utf-8"))
+    h.update(b"\0")
+    h.update(model.encode("utf-8"))
+    return h.hexdigest()
+
+# Hot in-memory layer over the on-disk response cache; repeated sends
+# within one session skip the file read entirely.
+_response_cache_mem = {}
+
+def load_cached_response(cache_key):
+    """Returns the cached response text for cache_key, or None on a miss."""
+    cached = _response_cache_mem.get(cache_key)
+    if cached is not None:
+        return cached
+    cache_file = os.path.join(RESPONSE_CACHE_DIR, f"{cache_key}.json")
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            _response_cache_mem[cache_key] = content
+            return content
+        except Exception as e:
+            print(f"[DEBUG] Failed to read response cache {cache_file}: {e}")
+    return None
+
+def save_cached_response(cache_key, response_content):
+    """Writes a response to the cache atomically (tmp file + rename)."""
+    _response_cache_mem[cache_key] = response_content
     try:
-        if provider == "openai":
-            client = OpenAI(api_key=openai_api_key)
-            messages = [
-                {"role": "user", "content": f"{combined_code}\n\n{user_prompt_intro}\n\n{user_prompt}"}
-            ]
-            response = client.chat.completions.create(
-                messages=messages,
+        os.makedirs(RESPONSE_CACHE_DIR, exist_ok=True)
+        cache_file = os.path.join(RESPONSE_CACHE_DIR, f"{cache_key}.json")
+        tmp = cache_file + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(response_content)
+        os.replace(tmp, cache_file)
+    except Exception as e:
+        print(f"[DEBUG] Failed to write response cache: {e}")
+
+def request_completion(provider, selected_model, combined_code, user_prompt):
+    """
+    Sends the combined code + prompt to the selected provider and returns
+    the raw response text. Raises on any API failure. Safe to call from a
+    worker thread (no Tk access).
+    """
+    # Build the multi-MB payload string exactly once rather than
+    # re-interpolating it inside each provider branch.
+    payload_text = "".join((combined_code, "\n\n", user_prompt_intro, "\n\n", user_prompt))
+
+    if provider == "openai":
+        from openai import OpenAI
+        client = OpenAI(api_key=openai_api_key)
+        messages = [
+            {"role": "user", "content": payload_text}
+        ]
+        response = client.chat.completions.create(
+            messages=messages,
+            model=selected_model,
+        )
+        return response.choices[0].message.content
+
+    elif provider == "deepseek":
+        messages = [
+            SYSTEM_MESSAGE_FOR_JSON,
+            {"role": "user", "content": payload_text}
+        ]
+        headers = {"Authorization": f"Bearer {deepseek_api_key}", "Content-Type": "application/json"}
+        data = {
+            "messages": messages,
+            "model": selected_model,
+            "response_format": {"type": "json_object"},
+            "temperature": 0.7
+        }
+        response = get_http_session().post(DEEPSEEK_API_ENDPOINT, headers=headers,
+                                           json=data, timeout=(10, 300))
+        response.raise_for_status()
+        response_data = response.json()
+        return response_data['choices'][0]['message']['content']
+
+    elif provider == "anthropic":
+        import anthropic
+        anthro_client = anthropic.Anthropic()
+
+        system_message = SYSTEM_MESSAGE_FOR_JSON["content"]  # Extract system instructions
+        user_content = payload_text
+
+        try:
+            response = anthro_client.messages.create(
                 model=selected_model,
+                max_tokens=8000,
+                system=system_message,  # Anthropic allows a system message
+                messages=[{"role": "user", "content": user_content}]
             )
-            response_content = response.choices[0].message.content
-
-        elif provider == "deepseek":
-            messages = [
-                SYSTEM_MESSAGE_FOR_JSON,
-                {"role": "user", "content": f"{combined_code}\n\n{user_prompt_intro}\n\n{user_prompt}"}
-            ]
-            headers = {"Authorization": f"Bearer {deepseek_api_key}", "Content-Type": "application/json"}
-            data = {
-                "messages": messages,
-                "model": selected_model,
-                "response_format": {"type": "json_object"},
-                "temperature": 0.7
-            }
-            response = requests.post(DEEPSEEK_API_ENDPOINT, headers=headers, json=data)
-            response.raise_for_status()
-            response_data = response.json()
-            response_content = response_data['choices'][0]['message']['content']
-
-        elif provider == "anthropic":
-            anthro_client = anthropic.Anthropic()
-        
-            system_message = SYSTEM_MESSAGE_FOR_JSON["content"]  # Extract system instructions
-            user_content = f"{combined_code}\n\n{user_prompt_intro}\n\n{user_prompt}"  # Convert user input to a single string
-        
-            try:
-                response = anthro_client.messages.create(
-                    model=selected_model,
-                    max_tokens=8000,
-                    system=system_message,  # Anthropic allows a system message
-                    messages=[{"role": "user", "content": user_content}]  
-                )
-                response_content = response.content[0].text
-        
-            except anthropic.APIError as e:
-                messagebox.showerror("Anthropic API Error", f"Error: {e.status_code} - {e.message}")
-                return
-            except Exception as e:
-                messagebox.showerror("Error", f"Unexpected error: {e}")
-                return
-
-        elif provider == "ollama":
-            # Use local LLMs installed in docker containers via Ollama
-            local_llm_endpoints = {
-                "gemma3:27b": OLLAMA_GEMMA3_ENDPOINT,
-                "qwq": OLLAMA_QWQ_ENDPOINT
-            }
-            endpoint = local_llm_endpoints.get(selected_model)
-            if not endpoint:
-                messagebox.showerror("Error", f"No endpoint configured for model: {selected_model}")
-                return
-            payload = {
-                "prompt": f"{combined_code}\n\n{user_prompt_intro}\n\n{user_prompt}"
-            }
-            try:
-                r = requests.post(endpoint + "/completions", json=payload, timeout=60)
-                r.raise_for_status()
-                response_data = r.json()
-                response_content = response_data.get("response", "")
-            except Exception as e:
-                messagebox.showerror("Error", f"Local LLM request failed: {e}")
-                return
+            return response.content[0].text
+        except anthropic.APIError as e:
+            raise Exception(f"Anthropic API error: {e.status_code} - {e.message}")
 
-        # Parse JSON output
-        try:
-            json_object = json.loads(response_content)
-            formatted_json = json.dumps(json_object, indent=2)
-            response_content = formatted_json
-        except json.JSONDecodeError as e:
-            messagebox.showerror("JSON Error", f"Failed to parse JSON from response:\n{e}")
+    elif provider == "ollama":
+        # Use local LLMs installed in docker containers via Ollama
+        local_llm_endpoints = {
+            "gemma3:27b": OLLAMA_GEMMA3_ENDPOINT,
+            "qwq": OLLAMA_QWQ_ENDPOINT
+        }
+        endpoint = local_llm_endpoints.get(selected_model)
+        if not endpoint:
+            raise Exception(f"No endpoint configured for model: {selected_model}")
+        payload = {
+            "prompt": payload_text
+        }
+        r = get_http_session().post(endpoint + "/completions", json=payload, timeout=(10, 60))
+        r.raise_for_status()
+        response_data = r.json()
+        return response_data.get("response", "")
+
+    raise Exception(f"Unknown provider: {provider}")
+
+def _finish_send(provider, response_content, error):
+    """
+    Runs on the Tk main thread after a request_completion worker finishes;
+    re-enables the send button and updates the response widget.
+    """
+    send_btn.config(state=tk.NORMAL)
 
-        text_json.delete("1.0", tk.END)
-        text_json.insert(tk.END, response_content)
-        messagebox.showinfo("Success", f"Response received from {provider.capitalize()}!")
+    if error is not None:
+        messagebox.showerror("Error", f"API request failed: {error}")
+        return
 
-    except Exception as e:
-        messagebox.showerror("Error", f"API request failed: {e}. response_content: {response_content}")
+    # Parse JSON output
+    try:
+        json_object = _json_loads(response_content)
+        formatted_json = _json_dumps_pretty(json_object)
+        response_content = formatted_json
+    except JSON_DECODE_ERRORS as e:
+        messagebox.showerror("JSON Error", f"Failed to parse JSON from response:\n{e}")
+
+    text_json.delete("1.0", tk.END)
+    text_json.insert(tk.END, response_content)
+    messagebox.showinfo("Success", f"Response received from {provider.capitalize()}!")
 
 # ------------------------------------------------------------------------
 # The following functions for downloading repos, processing code,
@@ -223,65 +366,260 @@ def send_to_api():
 # for 'anthropic' in the model selection.
 # ------------------------------------------------------------------------
 
+def try_git_clone(repo_url: str, extraction_dir: str):
+    """
+    Shallow-clones the repository's default branch when a git binary is
+    available. A depth-1 clone moves far fewer bytes than the full ZIP
+    archive and upgrades to an incremental fetch on re-runs. Returns the
+    checkout path, or None so the caller falls back to the ZIP download.
+    """
+    if shutil.which('git') is None:
+        return None
+
+    repo_name = repo_url.rstrip('/').split('/')[-1]
+    if not repo_name:
+        return None
+    clone_dir = os.path.join(extraction_dir, repo_name)
+
+    try:
+        if os.path.isdir(os.path.join(clone_dir, '.git')):
+            print(f"[DEBUG] Updating shallow clone at {clone_dir}")
+            fetch = subprocess.run(
+                ['git', '-C', clone_dir, 'fetch', '--depth=1', 'origin'],
+                capture_output=True, timeout=300)
+            if fetch.returncode != 0:
+                return None
+            reset = subprocess.run(
+                ['git', '-C', clone_dir, 'reset', '--hard', 'FETCH_HEAD'],
+                capture_output=True, timeout=60)
+            return clone_dir if reset.returncode == 0 else None
+
+        os.makedirs(extraction_dir, exist_ok=True)
+        print(f"[DEBUG] Shallow-cloning {repo_url} into {clone_dir}")
+        clone = subprocess.run(
+            ['git', 'clone', '--depth=1', '--single-branch', repo_url, clone_dir],
+            capture_output=True, timeout=300)
+        if clone.returncode == 0:
+            return clone_dir
+        shutil.rmtree(clone_dir, ignore_errors=True)
+    except (subprocess.TimeoutExpired, OSError) as e:
+        print(f"[DEBUG] git clone unavailable ({e}); falling back to ZIP download.")
+    return None
+
 def download_github_repo(repo_url: str, extraction_dir: str, max_retries=3) -> str:
     """
     Downloads a GitHub repository as a ZIP file from the specified URL and extracts it.
-    Tries 'main' and 'master' branches by default.
+    Prefers a shallow git clone when git is installed; otherwise tries the
+    'main' and 'master' branch archives.
     Returns the path to the extracted repository.
     """
+    cloned = try_git_clone(repo_url, extraction_dir)
+    if cloned:
+        return cloned
+
     if not repo_url.endswith('/'):
         repo_url += '/'
 
     branches_to_try = ["main", "master"]
-    zip_content = None
+    etag_cache = load_etag_cache()
+    zip_path = None
+    zip_url = None
+    new_etag = None
 
     for branch in branches_to_try:
         zip_url = repo_url + f"archive/refs/heads/{branch}.zip"
         print(f"[DEBUG] Trying branch '{branch}': {zip_url}")
-        zip_content = fetch_zip(zip_url, max_retries=max_retries)
-        if zip_content:
+
+        # Send the cached ETag so an unchanged branch answers 304 with no
+        # body, letting us reuse the previously extracted tree.
+        cached = etag_cache.get(zip_url, {})
+        cached_repo_path = cached.get('repo_path')
+        etag = cached.get('etag') if cached_repo_path and os.path.isdir(cached_repo_path) else None
+
+        result = fetch_zip(zip_url, max_retries=max_retries, etag=etag)
+        if result is NOT_MODIFIED:
+            print(f"[DEBUG] Branch '{branch}' unchanged (ETag match); reusing {cached_repo_path}")
+            return cached_repo_path
+        if result:
+            zip_path, new_etag = result
             break
 
-    if not zip_content:
+    if not zip_path:
         raise Exception(f"[ERROR] Failed to download repository from {repo_url} "
                         f"(tried branches {branches_to_try}).")
 
-    if not os.path.exists(extraction_dir):
-        os.makedirs(extraction_dir)
+    os.makedirs(extraction_dir, exist_ok=True)
+
+    try:
+        with zipfile.ZipFile(zip_path) as z:
+            first_member = next(iter(z.infolist()), None)
+            if first_member is None:
+                raise Exception("[ERROR] Zip archive is empty or invalid.")
+            if DEBUG_ZIP_CONTENTS:
+                print("[DEBUG] Zip file contents:", z.namelist())
+            extracted_name = first_member.filename.split('/', 1)[0]
+            repo_path = os.path.join(extraction_dir, extracted_name)
+
+            # Skip the O(files) disk writes when the same archive was
+            # already extracted here (e.g. a re-download of an unchanged
+            # branch from a server that doesn't honor ETags).
+            signature = compute_zip_signature(zip_path)
+            marker_file = os.path.join(extraction_dir, '.src_hash')
+            prior_signature = None
+            if os.path.exists(marker_file):
+                try:
+                    with open(marker_file, 'r', encoding='utf-8') as f:
+                        prior_signature = f.read().strip()
+                except Exception:
+                    pass
+
+            if prior_signature == signature and os.path.isdir(repo_path):
+                print("[DEBUG] Archive unchanged; reusing existing extraction.")
+            else:
+                shutil.rmtree(extraction_dir, ignore_errors=True)
+                os.makedirs(extraction_dir, exist_ok=True)
+                extract_zip_parallel(z, zip_path, extraction_dir)
+                try:
+                    atomic_write_text(marker_file, signature)
+                except Exception as e:
+                    print(f"[DEBUG] Could not write extraction marker: {e}")
+    finally:
+        try:
+            os.unlink(zip_path)
+        except OSError:
+            pass
 
-    with zipfile.ZipFile(io.BytesIO(zip_content)) as z:
-        if not z.namelist():
-            raise Exception("[ERROR] Zip archive is empty or invalid.")
-        print("[DEBUG] Zip file contents:", z.namelist())
-        z.extractall(extraction_dir)
-        extracted_name = z.namelist()[0].split('/')[0]
-        repo_path = os.path.join(extraction_dir, extracted_name)
+    if new_etag:
+        etag_cache[zip_url] = {'etag': new_etag, 'repo_path': repo_path}
+        save_etag_cache(etag_cache)
 
     print(f"[DEBUG] Repository extracted to: {repo_path}")
     return repo_path
 
-def fetch_zip(url, max_retries=3, timeout=30):
+def compute_zip_signature(zip_path):
+    """Cheap archive identity: byte size plus a blake2b of the first 64 KiB."""
+    with open(zip_path, 'rb') as f:
+        head = f.read(64 * 1024)
+    size = os.path.getsize(zip_path)
+    return f"{size}:{hashlib.blake2b(head, digest_size=16).hexdigest()}"
+
+def load_etag_cache():
+    """Returns the URL -> {etag, repo_path} cache, or {} if unavailable."""
+    if os.path.exists(ETAG_CACHE_FILE):
+        try:
+            with open(ETAG_CACHE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+        except Exception as e:
+            print(f"[DEBUG] Failed to load ETag cache: {e}")
+    return {}
+
+def save_etag_cache(cache):
+    try:
+        os.makedirs(os.path.dirname(ETAG_CACHE_FILE), exist_ok=True)
+        atomic_write_text(ETAG_CACHE_FILE, json.dumps(cache))
+    except Exception as e:
+        print(f"[DEBUG] Failed to save ETag cache: {e}")
+
+def extract_zip_parallel(z, zip_path, extraction_dir):
     """
-    Attempts to download a ZIP file from the given URL with retries.
-    Returns the raw bytes if successful, otherwise None.
+    Extracts a zip archive using a thread pool. Directories are created
+    serially first; file members are then decompressed in parallel (zlib
+    releases the GIL). Each worker opens its own ZipFile handle on
+    zip_path so workers don't serialize on the shared internal lock.
     """
+    dir_members = [m for m in z.infolist() if m.is_dir()]
+    file_members = [m for m in z.infolist() if not m.is_dir()]
+
+    for m in dir_members:
+        z.extract(m, extraction_dir)
+
+    local = threading.local()
+
+    def _extract_one(member):
+        worker_zip = getattr(local, 'zip', None)
+        if worker_zip is None:
+            worker_zip = zipfile.ZipFile(zip_path)
+            local.zip = worker_zip
+        worker_zip.extract(member, extraction_dir)
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as ex:
+        list(ex.map(_extract_one, file_members))
+
+_http_session = None
+
+def get_http_session():
+    """
+    Lazily creates a shared requests.Session so repeated downloads reuse
+    one keep-alive connection instead of paying a fresh TCP+TLS handshake
+    per click. requests itself is imported on first use.
+    """
+    global _http_session
+    if _http_session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.5,
+                              status_forcelist=[502, 503, 504])
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _http_session = session
+    return _http_session
+
+def fetch_zip(url, max_retries=3, timeout=30, etag=None):
+    """
+    Attempts to download a ZIP file from the given URL with retries,
+    streaming it to a temporary file so the archive is never held in memory.
+    If etag is given it is sent as If-None-Match; a 304 answer returns the
+    NOT_MODIFIED sentinel. Returns (temp_path, response_etag) on success,
+    otherwise None.
+    """
+    session = get_http_session()
+
+    headers = {'If-None-Match': etag} if etag else {}
     for attempt in range(max_retries):
         try:
             print(f"[DEBUG] Attempt {attempt+1} - GET {url}")
-            r = requests.get(url, timeout=timeout)
-            print(f"[DEBUG] Status code: {r.status_code}")
-            print(f"[DEBUG] Response size (bytes): {len(r.content)}")
+            with session.get(url, timeout=(10, timeout), stream=True, headers=headers) as r:
+                print(f"[DEBUG] Status code: {r.status_code}")
+
+                if r.status_code == 304:
+                    return NOT_MODIFIED
+
+                if r.status_code != 200:
+                    print(f"[DEBUG] Non-200 status code ({r.status_code}). Retrying...\n")
+                    continue
 
-            if r.status_code == 200:
                 content_type = r.headers.get('content-type', '')
                 print(f"[DEBUG] Content-Type: {content_type}")
-                # Check if it's a valid zip by header or content-type
-                if 'zip' in content_type.lower() or r.content.startswith(b'PK\x03\x04'):
-                    return r.content
-                else:
-                    print("[DEBUG] Response not recognized as a valid zip file. Retrying...\n")
-            else:
-                print(f"[DEBUG] Non-200 status code ({r.status_code}). Retrying...\n")
+
+                tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".zip")
+                total_bytes = 0
+                try:
+                    for chunk in r.iter_content(chunk_size=1 << 20):
+                        # Check the zip signature on the first chunk so HTML
+                        # error pages are rejected without downloading more.
+                        if total_bytes == 0 and not (
+                                'zip' in content_type.lower() or chunk.startswith(b'PK\x03\x04')):
+                            print("[DEBUG] Response not recognized as a valid zip file. Retrying...\n")
+                            break
+                        tmp.write(chunk)
+                        total_bytes += len(chunk)
+                    else:
+                        if total_bytes > 0:
+                            tmp.close()
+                            print(f"[DEBUG] Response size (bytes): {total_bytes}")
+                            return tmp.name, r.headers.get('ETag')
+                finally:
+                    if not tmp.closed:
+                        tmp.close()
+                        os.unlink(tmp.name)
         except Exception as e:
             print(f"[DEBUG] Attempt {attempt+1} got exception: {e}. Retrying...\n")
 
@@ -290,45 +628,78 @@ def fetch_zip(url, max_retries=3, timeout=30):
 def get_plugin_info(repo_path: str):
     """
     Attempt to detect a WordPress plugin name/version from a top-level .php file.
+    Results are memoized per (repo_path, header-file mtimes) so repeated
+    combines of an unchanged checkout skip the header re-scan; editing a
+    PHP file in place bumps its mtime and invalidates the entry.
     """
+    try:
+        with os.scandir(repo_path) as it:
+            php_key = tuple(sorted(
+                (e.name, e.stat().st_mtime_ns) for e in it
+                if e.is_file(follow_symlinks=False)
+                and e.name.lower().endswith(".php")
+            ))
+    except OSError:
+        php_key = ()
+    return _get_plugin_info_cached(repo_path, php_key)
+
+@lru_cache(maxsize=8)
+def _get_plugin_info_cached(repo_path, php_key):
     plugin_name = None
     plugin_version = None
 
-    top_level_files = [
-        f for f in os.listdir(repo_path)
-        if os.path.isfile(os.path.join(repo_path, f))
-    ]
-
-    for fname in top_level_files:
-        if fname.lower().endswith(".php"):
-            full_path = os.path.join(repo_path, fname)
-            try:
-                with open(full_path, "r", encoding="utf-8", errors="ignore") as f:
-                    contents = f.read()
-                for line in contents.splitlines():
-                    if "Plugin Name:" in line:
-                        name_part = line.split("Plugin Name:", 1)[1].strip()
-                        name_part = name_part.strip("*/ ")
-                        if name_part:
-                            plugin_name = name_part
-                            print(f"[DEBUG] Detected plugin name: {plugin_name}")
-                    if "Version:" in line:
-                        version_part = line.split("Version:", 1)[1].strip()
-                        version_part = version_part.strip("*/ ")
-                        if version_part:
-                            plugin_version = version_part
-                            print(f"[DEBUG] Detected plugin version: {plugin_version}")
-                if plugin_name or plugin_version:
-                    break
-            except Exception as e:
-                print(f"[DEBUG] Could not read {fname} for plugin info: {e}")
+    for fname, _mtime in php_key:
+        full_path = os.path.join(repo_path, fname)
+        try:
+            with open(full_path, "r", encoding="utf-8", errors="ignore") as f:
+                contents = f.read()
+            for match in PLUGIN_HEADER_RE.finditer(contents):
+                value = match.group(2).strip("*/ ")
+                if not value:
+                    continue
+                if match.group(1) == "Plugin Name":
+                    plugin_name = value
+                    print(f"[DEBUG] Detected plugin name: {plugin_name}")
+                else:
+                    plugin_version = value
+                    print(f"[DEBUG] Detected plugin version: {plugin_version}")
+            if plugin_name or plugin_version:
+                break
+        except Exception as e:
+            print(f"[DEBUG] Could not read {fname} for plugin info: {e}")
 
     return plugin_name, plugin_version
 
+@lru_cache(maxsize=1)
 def load_custom_instructions(path="custom_instructions.txt"):
+    """
+    Reads the AI instruction block appended to every combined output.
+    The content is static for the life of the process, so it is read
+    from disk once and memoized.
+    """
     with open(path, "r", encoding="utf-8") as f:
         return f.read()
 
+def iter_repo_files(root_path, skip_dirs, rel_prefix=""):
+    """
+    Recursively yields (filepath, relative_path) tuples via os.scandir,
+    pruning skip_dirs before descending. Carrying the relative prefix as
+    a string avoids an os.path.relpath call per file.
+    """
+    with os.scandir(os.path.join(root_path, rel_prefix) if rel_prefix else root_path) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name not in skip_dirs and entry.name not in VCS_DIRS:
+                yield from iter_repo_files(root_path, skip_dirs,
+                                           os.path.join(rel_prefix, entry.name))
+        elif entry.is_file(follow_symlinks=False):
+            yield entry.path, os.path.join(rel_prefix, entry.name)
+
+# Snapshot signature of the last combine per output file, so unchanged
+# repositories skip the re-read entirely within one session.
+_combine_signatures = {}
+
 def process_repository(repo_path: str,
                        output_dir: str,
                        skip_dirs: list,
@@ -337,36 +708,98 @@ def process_repository(repo_path: str,
                        plugin_name: str = None,
                        plugin_version: str = None):
     """
-    Walks the repo, reading all files (excluding skip_dirs), and merges them into
-    one big string with instructions. Returns that combined string.
+    Walks the repo, reading all files (excluding skip_dirs), and merges them
+    into one big text file with instructions. Returns the path to that file;
+    callers that need the text read (or mmap) it from disk so only one copy
+    lives in memory at a time.
     """
-    combined_contents = []
-    included_files = []
-    total_chars = 0
-
     # Additional AI instructions appended at the end of the combined text
     ai_instructions = load_custom_instructions()
 
-    for root_dir, dirs, files in os.walk(repo_path, topdown=True):
-        # Exclude directories in skip_dirs
-        dirs[:] = [d for d in dirs if d not in skip_dirs]
+    # First pass: collect file paths (cheap), pruning skipped directories.
+    file_entries = list(iter_repo_files(repo_path, skip_dirs))
 
-        for filename in files:
-            filepath = os.path.join(root_dir, filename)
-            relative_path = os.path.relpath(filepath, repo_path)
-            header = f"--- {relative_path} ---\n"
+    # Fingerprint the snapshot (paths + sizes + mtimes) so a second
+    # combine of an unchanged tree reuses the previous output instead of
+    # re-reading every file.
+    sig = hashlib.blake2b(digest_size=16)
+    sig.update(f"{max_chars}|{chars_per_token}".encode())
+    for filepath, relative_path in file_entries:
+        try:
+            st = os.stat(filepath)
+            sig.update(f"{relative_path}|{st.st_mtime_ns}|{st.st_size}".encode())
+        except OSError:
+            sig.update(relative_path.encode())
+    repo_signature = sig.hexdigest()
 
-            try:
-                with open(filepath, "r", encoding="utf-8", errors="ignore") as f:
-                    content = f.read()
-            except Exception as e:
-                print(f"[DEBUG] Could not read file '{relative_path}' - {e}")
-                content = "<Could not read file>"
+    base_name = plugin_name if plugin_name else "all_code"
+    if plugin_version:
+        base_name += f" v{plugin_version}"
+    os.makedirs(output_dir, exist_ok=True)
+    output_filename = os.path.join(output_dir, f"{base_name}.txt")
 
-            file_text = header + content + "\n\n"
-            combined_contents.append(file_text)
-            included_files.append(relative_path)
-            total_chars += len(file_text)
+    # Bail out before the read pass: an unchanged tree means the read,
+    # budget, and rewrite would all reproduce the file already on disk.
+    if (_combine_signatures.get(output_filename) == repo_signature
+            and os.path.isfile(output_filename)):
+        print(f"[DEBUG] Repository unchanged; reusing {output_filename}.")
+        return output_filename
+
+    # Second pass: read files in parallel (the GIL is released during read),
+    # then assemble in walk order so output stays deterministic.
+    def _read_one(entry):
+        filepath, relative_path = entry
+        try:
+            if os.path.getsize(filepath) > MAX_COMBINE_FILE_SIZE:
+                print(f"[DEBUG] Skipping large file '{relative_path}'")
+                return relative_path, None
+            with open(filepath, "rb") as f:
+                head = f.read(8192)
+                # A NUL byte in the head marks media/compiled blobs the
+                # AI can't use anyway; known text extensions skip the sniff.
+                ext = os.path.splitext(relative_path)[1].lower()
+                if ext not in TEXT_FILE_EXTENSIONS and b'\0' in head:
+                    print(f"[DEBUG] Skipping binary file '{relative_path}'")
+                    return relative_path, None
+                content = (head + f.read()).decode("utf-8", "ignore")
+        except Exception as e:
+            print(f"[DEBUG] Could not read file '{relative_path}' - {e}")
+            content = "<Could not read file>"
+        return relative_path, content
+
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        results = list(ex.map(_read_one, file_entries))
+
+    combined_contents = []
+    included_files = []
+    total_chars = 0
+    for relative_path, content in results:
+        if content is None:
+            continue
+        file_text = f"--- {relative_path} ---\n" + content + "\n\n"
+        combined_contents.append(file_text)
+        included_files.append(relative_path)
+        total_chars += len(file_text)
+
+    # Enforce the size budget (previously accepted but never applied):
+    # drop the largest files first until the combined text fits, so the
+    # API call can't fail on context length.
+    dropped_for_budget = []
+    if total_chars > max_chars:
+        by_size = sorted(range(len(combined_contents)),
+                         key=lambda i: len(combined_contents[i]), reverse=True)
+        for idx in by_size:
+            if total_chars <= max_chars:
+                break
+            total_chars -= len(combined_contents[idx])
+            dropped_for_budget.append(included_files[idx])
+            combined_contents[idx] = None
+        dropped_set = set(dropped_for_budget)
+        combined_contents = [c for c in combined_contents if c is not None]
+        included_files = [f for f in included_files if f not in dropped_set]
+        print(f"[DEBUG] Dropped {len(dropped_for_budget)} file(s) to fit the "
+              f"{max_chars}-char budget (~{max_chars // chars_per_token} tokens).")
 
     included_files.sort()
     intro_lines = [
@@ -376,6 +809,12 @@ def process_repository(repo_path: str,
     for sd in skip_dirs:
         intro_lines.append(f"- {sd}\n")
 
+    if dropped_for_budget:
+        intro_lines.append("\nNote: The following files were omitted to keep "
+                           "the code within the size budget:\n")
+        for fpath in sorted(dropped_for_budget):
+            intro_lines.append(f"- {fpath}\n")
+
     intro_lines.append("\nBelow is the file/folder structure of all **included** files:\n\n")
     for fpath in included_files:
         intro_lines.append(f"{fpath}\n")
@@ -383,20 +822,24 @@ def process_repository(repo_path: str,
 
     intro_block = "".join(intro_lines)
 
-    base_name = plugin_name if plugin_name else "all_code"
-    if plugin_version:
-        base_name += f" v{plugin_version}"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    output_filename = os.path.join(output_dir, f"{base_name}.txt")
-
-    final_output = intro_block + "".join(combined_contents) + "".join(ai_instructions)
-
-    with open(output_filename, "w", encoding="utf-8") as outfile:
-        outfile.write(final_output)
-
-    print(f"[DEBUG] Wrote {output_filename} with {len(final_output)} characters.")
-    return final_output
+    # Stream pieces straight to the output file instead of joining the
+    # whole blob first; the callers still need the full string, so build
+    # it exactly once at the end.
+    written_chars = 0
+    tmp_filename = output_filename + ".tmp"
+    with open(tmp_filename, "w", encoding="utf-8", buffering=1 << 20) as outfile:
+        outfile.write(intro_block)
+        written_chars += len(intro_block)
+        for file_text in combined_contents:
+            outfile.write(file_text)
+            written_chars += len(file_text)
+        outfile.write(ai_instructions)
+        written_chars += len(ai_instructions)
+    os.replace(tmp_filename, output_filename)
+    _combine_signatures[output_filename] = repo_signature
+
+    print(f"[DEBUG] Wrote {output_filename} with {written_chars} characters.")
+    return output_filename
 
 def apply_function_level_change(lines, func_name, action, code, file_extension):
     """
@@ -413,6 +856,29 @@ def apply_function_level_change(lines, func_name, action, code, file_extension):
     else:
         return apply_line_level_change(lines, action, code, line_code=code)
 
+def _line_insert_before(lines, idx, new_code_lines):
+    if new_code_lines:
+        lines[idx:idx] = new_code_lines
+
+def _line_insert_after(lines, idx, new_code_lines):
+    if new_code_lines:
+        lines[idx + 1:idx + 1] = new_code_lines
+
+def _line_delete(lines, idx, new_code_lines):
+    del lines[idx]
+
+def _line_replace(lines, idx, new_code_lines):
+    if new_code_lines:
+        lines[idx:idx + 1] = new_code_lines
+
+# Constant-time action dispatch for line-level changes.
+LINE_ACTIONS = {
+    "insert before": _line_insert_before,
+    "insert after": _line_insert_after,
+    "delete": _line_delete,
+    "replace": _line_replace,
+}
+
 def apply_line_level_change(lines, action, new_code, line_code=None, reference_line_number=None):
     """
     Applies line-level changes (insert before/after, delete, replace).
@@ -421,7 +887,8 @@ def apply_line_level_change(lines, action, new_code, line_code=None, reference_l
         print(f"[WARNING] Line code not provided for line-level change.")
         return lines
 
-    matching_indices = [i for i, line in enumerate(lines) if line.strip() == line_code.strip()]
+    target = line_code.strip()
+    matching_indices = [i for i, line in enumerate(lines) if line.strip() == target]
     if not matching_indices:
         print(f"[WARNING] No lines matching code '{line_code}' found. No changes applied.")
         return lines
@@ -433,86 +900,146 @@ def apply_line_level_change(lines, action, new_code, line_code=None, reference_l
     else:
         closest_idx = matching_indices[0]
 
-    if action == "insert before":
-        if new_code:
-            new_code_lines = new_code.splitlines(True)
-            lines = lines[:closest_idx] + new_code_lines + lines[closest_idx:]
-    elif action == "insert after":
-        if new_code:
-            new_code_lines = new_code.splitlines(True)
-            lines = lines[:closest_idx + 1] + new_code_lines + lines[closest_idx + 1:]
-    elif action == "delete":
-        del lines[closest_idx]
-    elif action == "replace":
-        if new_code:
-            new_code_lines = new_code.splitlines(True)
-            lines = lines[:closest_idx] + new_code_lines + lines[closest_idx + 1:]
-    else:
+    handler = LINE_ACTIONS.get(action)
+    if handler is None:
         print(f"[WARNING] Unknown action '{action}' for line-level change. No changes applied.")
+        return lines
 
+    handler(lines, closest_idx, new_code.splitlines(True) if new_code else None)
     return lines
 
+def find_python_function_bounds(lines, func_name):
+    """
+    Locates func_name by parsing the source with ast and returns
+    (start_idx, end_idx, decorator_start) as 0-based line indices.
+    Returns None when the source does not parse, so the caller can
+    fall back to the indentation scan.
+    """
+    try:
+        tree = ast.parse("".join(lines))
+    except (SyntaxError, ValueError):
+        return None
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == func_name:
+            decorator_start = None
+            if node.decorator_list:
+                decorator_start = node.decorator_list[0].lineno - 1
+            return node.lineno - 1, node.end_lineno - 1, decorator_start
+    return None
+
 def apply_python_function_change(lines, func_name, action, code):
     """
     Locates a Python function by 'def func_name(...)' and applies the specified action.
     """
-    func_def_pattern = re.compile(r'^def\s+' + re.escape(func_name) + r'\s*\(')
+    needle = "def " + func_name
     start_idx = None
     end_idx = None
     decorator_start = None
 
-    # Find the function start (including decorators above it)
-    for i, line in enumerate(lines):
-        if func_def_pattern.match(line.strip()):
-            start_idx = i
-            j = i - 1
-            while j >= 0 and lines[j].strip().startswith('@'):
-                decorator_start = j
-                j -= 1
-            if decorator_start is not None:
-                start_idx = decorator_start
-            break
+    # A single ast.parse gives exact boundaries (nested defs, multi-line
+    # signatures, async functions) in one pass; the line scan below is
+    # only the fallback for sources that do not parse.
+    bounds = find_python_function_bounds(lines, func_name)
+    if bounds is not None:
+        start_idx, end_idx, decorator_start = bounds
+        if decorator_start is not None:
+            start_idx = decorator_start
+
+    if bounds is None:
+        # Find the function start (including decorators above it). A prefix
+        # test plus a paren check is much cheaper than a regex per line.
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if stripped.startswith(needle) and stripped[len(needle):].lstrip().startswith('('):
+                start_idx = i
+                j = i - 1
+                while j >= 0 and lines[j].strip().startswith('@'):
+                    decorator_start = j
+                    j -= 1
+                if decorator_start is not None:
+                    start_idx = decorator_start
+                break
 
     if start_idx is None:
         print(f"[WARNING] Could not find function '{func_name}' in Python file. No changes applied.")
         return lines
 
-    # Indentation-based detection of end of function
-    func_indent = len(lines[start_idx]) - len(lines[start_idx].lstrip())
-    for j in range(start_idx + 1, len(lines)):
-        stripped_line = lines[j].strip()
-        if not stripped_line:
-            continue
-        current_indent = len(lines[j]) - len(lines[j].lstrip())
-        if current_indent <= func_indent and not stripped_line.startswith('@'):
-            end_idx = j - 1
-            break
-    else:
-        end_idx = len(lines) - 1
-
     if end_idx is None:
-        end_idx = len(lines) - 1
+        # Indentation-based detection of end of function
+        func_indent = len(lines[start_idx]) - len(lines[start_idx].lstrip())
+        for j in range(start_idx + 1, len(lines)):
+            stripped_line = lines[j].strip()
+            if not stripped_line:
+                continue
+            current_indent = len(lines[j]) - len(lines[j].lstrip())
+            if current_indent <= func_indent and not stripped_line.startswith('@'):
+                end_idx = j - 1
+                break
+        else:
+            end_idx = len(lines) - 1
+
+    code_lines = code.splitlines(True) if code else None
 
     if action == "insert before":
-        if code:
-            new_code_lines = code.splitlines(True)
+        if code_lines:
             insertion_idx = decorator_start if decorator_start is not None else start_idx
-            lines = lines[:insertion_idx] + new_code_lines + lines[insertion_idx:]
+            lines[insertion_idx:insertion_idx] = code_lines
     elif action == "insert after":
-        if code:
-            new_code_lines = code.splitlines(True)
-            lines = lines[:end_idx + 1] + new_code_lines + lines[end_idx + 1:]
+        if code_lines:
+            lines[end_idx + 1:end_idx + 1] = code_lines
     elif action == "delete":
         del lines[start_idx:end_idx + 1]
     elif action == "replace":
-        if code:
-            new_code_lines = code.splitlines(True)
-            lines = lines[:start_idx] + new_code_lines + lines[end_idx + 1:]
+        if code_lines:
+            lines[start_idx:end_idx + 1] = code_lines
     else:
         print(f"[WARNING] Unknown action '{action}' for function '{func_name}' in Python file. No changes applied.")
 
     return lines
 
+def count_code_braces(line, in_block_comment):
+    """
+    Counts '{' and '}' in a line of JS/PHP, ignoring braces inside
+    string literals and comments. Returns (opens, closes,
+    in_block_comment) so block-comment state carries across lines.
+    """
+    opens = 0
+    closes = 0
+    quote = None
+    i = 0
+    n = len(line)
+    while i < n:
+        ch = line[i]
+        if in_block_comment:
+            if ch == '*' and line.startswith('*/', i):
+                in_block_comment = False
+                i += 2
+                continue
+        elif quote:
+            if ch == '\\':
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+        elif ch in ('"', "'", '`'):
+            quote = ch
+        elif ch == '/' and i + 1 < n:
+            nxt = line[i + 1]
+            if nxt == '/':
+                break
+            if nxt == '*':
+                in_block_comment = True
+                i += 2
+                continue
+        elif ch == '#':
+            break
+        elif ch == '{':
+            opens += 1
+        elif ch == '}':
+            closes += 1
+        i += 1
+    return opens, closes, in_block_comment
+
 def apply_brace_delimited_function_change(lines, func_name, action, code):
     """
     For .js/.php, attempts to find 'function func_name(...) {' and track braces until the function ends.
@@ -531,8 +1058,7 @@ def apply_brace_delimited_function_change(lines, func_name, action, code):
 
     if action == "insert before":
         if code is not None:
-            new_code_lines = code.splitlines(True)
-            lines = lines[:start_idx] + new_code_lines + lines[start_idx:]
+            lines[start_idx:start_idx] = code.splitlines(True)
         else:
             print(f"[WARNING] 'insert before' but no code provided for {func_name}.")
         return lines
@@ -540,21 +1066,22 @@ def apply_brace_delimited_function_change(lines, func_name, action, code):
     brace_depth = 0
     func_end_idx = start_idx
     found_open_brace = False
+    in_block_comment = False
 
     for j in range(start_idx, len(lines)):
-        if '{' in lines[j]:
-            brace_depth += lines[j].count('{')
+        opens, closes, in_block_comment = count_code_braces(lines[j], in_block_comment)
+        if opens:
+            brace_depth += opens
             found_open_brace = True
-        if '}' in lines[j] and found_open_brace:
-            brace_depth -= lines[j].count('}')
-        if found_open_brace and brace_depth == 0:
-            func_end_idx = j
-            break
+        if found_open_brace:
+            brace_depth -= closes
+            if brace_depth <= 0:
+                func_end_idx = j
+                break
 
     if action == "insert after":
         if code is not None:
-            new_code_lines = code.splitlines(True)
-            lines = lines[:func_end_idx + 1] + new_code_lines + lines[func_end_idx + 1:]
+            lines[func_end_idx + 1:func_end_idx + 1] = code.splitlines(True)
         else:
             print(f"[WARNING] 'insert after' but no code provided for {func_name}.")
         return lines
@@ -567,9 +1094,7 @@ def apply_brace_delimited_function_change(lines, func_name, action, code):
         if code is None:
             print(f"[WARNING] 'replace' action but no code provided for {func_name}.")
             return lines
-        del lines[start_idx:func_end_idx + 1]
-        new_code_lines = code.splitlines(True)
-        lines = lines[:start_idx] + new_code_lines + lines[start_idx:]
+        lines[start_idx:func_end_idx + 1] = code.splitlines(True)
         return lines
 
     print(f"[WARNING] Unknown action '{action}' for {func_name}. No changes applied.")
@@ -579,25 +1104,76 @@ def apply_all_changes(repo_path, json_content):
     """
     Reads a JSON array of changes, applies them to the files in repo_path.
     """
+    # Reject non-array payloads before paying for a full parse; a valid
+    # changeset must start with '[' after any leading whitespace.
+    if json_content[:4096].lstrip()[:1] != '[':
+        raise ValueError("JSON root must be an array of changes.")
+
     try:
-        changes = json.loads(json_content)
-    except json.JSONDecodeError as e:
-        messagebox.showerror("JSON Error", f"Failed to parse JSON:\n{e}")
-        return
+        changes = _json_loads(json_content)
+    except JSON_DECODE_ERRORS as e:
+        raise ValueError(f"Failed to parse JSON:\n{e}")
 
     if not isinstance(changes, list):
-        messagebox.showerror("Invalid JSON", "JSON root must be an array of changes.")
-        return
+        raise ValueError("JSON root must be an array of changes.")
 
+    # Group changes by target file so each file is read and written once,
+    # no matter how many changes it receives.
+    changes_by_file = defaultdict(list)
     for change in changes:
-        if not isinstance(change, dict):
-            continue
-        required_keys = ["file", "action"]
-        if not all(k in change for k in required_keys):
+        # EAFP: the happy path is one dict lookup; malformed records
+        # (non-dicts, missing keys) fall into the except instead of
+        # paying isinstance + all() membership checks per record.
+        try:
+            file_rel = change["file"]
+            change["action"]
+        except (KeyError, TypeError):
             print(f"[WARNING] Incomplete change object: {change}")
             continue
+        changes_by_file[file_rel].append(change)
+
+    # Different files are independent, so apply them in parallel; the
+    # worker only reads/writes files and prints, so no Tk access happens
+    # off the main thread.
+    max_workers = min(16, (os.cpu_count() or 1) * 2)
+    logs = []
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = [
+            ex.submit(apply_changes_to_file, repo_path, file_rel, file_changes)
+            for file_rel, file_changes in changes_by_file.items()
+        ]
+        for future in futures:
+            logs.extend(future.result())
+
+    # One buffered write instead of a stdio lock + flush per file.
+    if logs:
+        sys.stdout.write("\n".join(logs) + "\n")
+
+def apply_changes_to_file(repo_path, file_rel, file_changes):
+    """
+    Reads one target file, applies its grouped changes in order, and
+    writes it back once. Returns its log lines so the caller can emit
+    them in one batch. Safe to run on a worker thread.
+    """
+    logs = []
+    target_file = os.path.join(repo_path, file_rel)
+    file_extension = os.path.splitext(file_rel)[1]
 
-        file_rel = change["file"]
+    if not os.path.exists(target_file):
+        logs.append(f"[WARNING] File does not exist: {target_file}")
+        return logs
+
+    try:
+        # One buffered read + a C-level split beats readlines()'s
+        # per-line iteration on big files.
+        with open(target_file, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines(keepends=True)
+    except Exception as e:
+        logs.append(f"[ERROR] Could not read file '{target_file}' - {e}")
+        return logs
+
+    applied = 0
+    for change in file_changes:
         func_name = change.get("functionName", None)
         line_code = change.get("lineCode", None)
         line_number = change.get("lineNumber", None)
@@ -606,35 +1182,40 @@ def apply_all_changes(repo_path, json_content):
         if code and not code.endswith('\n'):
             code = code + '\n'
 
-        target_file = os.path.join(repo_path, file_rel)
-        file_extension = os.path.splitext(file_rel)[1]
-
-        if not os.path.exists(target_file):
-            print(f"[WARNING] File does not exist: {target_file}")
-            continue
-
-        try:
-            with open(target_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-        except Exception as e:
-            print(f"[ERROR] Could not read file '{target_file}' - {e}")
-            continue
-
         if func_name:
-            updated_lines = apply_function_level_change(lines, func_name, action, code, file_extension)
+            lines = apply_function_level_change(lines, func_name, action, code, file_extension)
+            applied += 1
         elif line_code:
-            updated_lines = apply_line_level_change(lines, action, code, line_code=line_code, reference_line_number=line_number)
+            lines = apply_line_level_change(lines, action, code, line_code=line_code, reference_line_number=line_number)
+            applied += 1
         else:
-            print(f"[WARNING] Neither 'functionName' nor 'lineCode' provided for change: {change}")
-            continue
+            logs.append(f"[WARNING] Neither 'functionName' nor 'lineCode' provided for change: {change}")
 
-        try:
-            with open(target_file, 'w', encoding='utf-8') as f:
-                f.writelines(updated_lines)
-            print(f"[INFO] Changes applied to {file_rel}")
-        except Exception as e:
-            print(f"[ERROR] Could not write file '{target_file}' - {e}")
+    if not applied:
+        return logs
+
+    try:
+        # Sibling temp file + os.replace so a crash mid-write can't
+        # leave a truncated source file behind.
+        atomic_write_text(target_file, "".join(lines))
+        logs.append(f"[INFO] {applied} change(s) applied to {file_rel}")
+    except Exception as e:
+        logs.append(f"[ERROR] Could not write file '{target_file}' - {e}")
+    return logs
 
+def atomic_write_text(path, data):
+    """
+    Writes data to path via a temp file + os.replace so readers never
+    observe a truncated file if the process dies mid-write.
+    """
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+@lru_cache(maxsize=4)
 def load_last_path(filename):
     if os.path.exists(filename):
         try:
@@ -646,8 +1227,8 @@ def load_last_path(filename):
 
 def save_last_path(filename, path):
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(path.strip())
+        atomic_write_text(filename, path.strip())
+        load_last_path.cache_clear()
     except:
         pass
 
@@ -664,8 +1245,7 @@ def load_repo_list(filename):
 
 def save_repo_list(filename, repo_list):
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(repo_list, f)
+        atomic_write_text(filename, json.dumps(repo_list))
     except Exception as e:
         print(f"[DEBUG] Failed to save repo list to {filename}: {e}")
 
@@ -696,53 +1276,135 @@ def do_download_and_combine():
     if raw_input in repo_list:
         repo_list.remove(raw_input)
     repo_list.insert(0, raw_input)
-    save_repo_list(LAST_COMBINE_PATH_FILE, repo_list)
+    threading.Thread(target=save_repo_list,
+                     args=(LAST_COMBINE_PATH_FILE, repo_list), daemon=True).start()
     combine_combobox['values'] = repo_list
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
     output_dir = os.path.join(script_dir, "combined_output")
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
 
     extracted_dir = os.path.join(output_dir, "extracted")
 
-    if raw_input.startswith("http://") or raw_input.startswith("https://"):
+    is_url = raw_input.startswith("http://") or raw_input.startswith("https://")
+    if not is_url and not os.path.isdir(raw_input):
+        messagebox.showerror("Path Error", f"The provided path is not a directory:\n{raw_input}")
+        return
+
+    # Download, extraction, and the repo walk all block for seconds on
+    # large repos, so run them on a worker thread and marshal the result
+    # back to the Tk main loop via root.after.
+    combine_btn.config(state=tk.DISABLED)
+
+    def _worker():
         try:
-            repo_path = download_github_repo(raw_input, extracted_dir)
+            if is_url:
+                repo_path = download_github_repo(raw_input, extracted_dir)
+            else:
+                repo_path = raw_input
+
+            plugin_name, plugin_version = get_plugin_info(repo_path)
+
+            max_tokens = 128000
+            chars_per_token = 4
+            max_chars = max_tokens * chars_per_token
+
+            output_path = process_repository(
+                repo_path,
+                output_dir,
+                SKIP_DIRS,
+                max_chars,
+                chars_per_token,
+                plugin_name=plugin_name,
+                plugin_version=plugin_version
+            )
         except Exception as e:
-            messagebox.showerror("Download Error", f"Failed to download and extract the repository:\n{e}")
+            root.after(0, _finish_combine, None, str(e))
             return
+        root.after(0, _finish_combine, output_path, None)
+
+    threading.Thread(target=_worker, daemon=True).start()
+
+def copy_file_to_clipboard(path):
+    """
+    Copies the contents of path to the system clipboard via a native
+    helper (pbcopy/clip/xsel/xclip), streaming straight from disk and
+    bypassing Tcl's slow handling of multi-MB strings. Returns True on
+    success, False if no helper is available or it failed.
+    """
+    if sys.platform == 'darwin':
+        candidates = [['pbcopy']]
+    elif sys.platform == 'win32':
+        candidates = [['clip']]
     else:
-        if os.path.exists(raw_input):
-            repo_path = raw_input
-        else:
-            messagebox.showerror("Path Error", f"The provided path does not exist:\n{raw_input}")
-            return
+        candidates = [['xsel', '-bi'], ['xclip', '-selection', 'clipboard']]
 
-    plugin_name, plugin_version = get_plugin_info(repo_path)
+    for cmd in candidates:
+        if shutil.which(cmd[0]):
+            try:
+                with open(path, 'rb') as f:
+                    subprocess.run(cmd, stdin=f, check=True)
+                return True
+            except Exception as e:
+                print(f"[DEBUG] Native clipboard via '{cmd[0]}' failed: {e}")
+    return False
 
-    max_tokens = 128000
-    chars_per_token = 4
-    max_chars = max_tokens * chars_per_token
+def _finish_combine(output_path, error):
+    """
+    Runs on the Tk main thread once the combine worker finishes; copies
+    the result to the clipboard and re-enables the button.
+    """
+    combine_btn.config(state=tk.NORMAL)
 
-    final_output = process_repository(
-        repo_path,
-        output_dir,
-        SKIP_DIRS,
-        max_chars,
-        chars_per_token,
-        plugin_name=plugin_name,
-        plugin_version=plugin_version
-    )
+    if error is not None:
+        messagebox.showerror("Error", f"Failed to download and combine the repository:\n{error}")
+        return
 
-    # Copy the combined code to clipboard
-    root.clipboard_clear()
-    root.clipboard_append(final_output)
-    root.update()
+    if not copy_file_to_clipboard(output_path):
+        # Fall back to the Tk clipboard in 256 KiB slices so the full
+        # text never exists as one Python string alongside Tk's copy.
+        root.clipboard_clear()
+        with open(output_path, 'r', encoding='utf-8') as f:
+            while True:
+                chunk = f.read(256 * 1024)
+                if not chunk:
+                    break
+                root.clipboard_append(chunk)
+        root.update()
 
     messagebox.showinfo("Success", "Code combined and copied to clipboard!\n"
                                    "Paste into ChatGPT (or other AI) for review.")
 
+def _start_apply_worker(repo_path, json_input):
+    """
+    Runs apply_all_changes on a daemon thread so large edit batches don't
+    freeze the UI, then reports back on the Tk main thread.
+    """
+    apply_btn.config(state=tk.DISABLED)
+    apply_file_btn.config(state=tk.DISABLED)
+
+    def _worker():
+        error = None
+        try:
+            apply_all_changes(repo_path, json_input)
+        except Exception as e:
+            error = e
+        root.after(0, _finish_apply, error)
+
+    threading.Thread(target=_worker, daemon=True).start()
+
+def _finish_apply(error):
+    """
+    Runs on the Tk main thread once the apply worker finishes.
+    """
+    apply_btn.config(state=tk.NORMAL)
+    apply_file_btn.config(state=tk.NORMAL)
+
+    if error is not None:
+        messagebox.showerror("Error", f"Failed to apply changes:\n{error}")
+        return
+    messagebox.showinfo("Done", "Code changes have been applied.")
+
 def do_apply_all_changes():
     """
     Applies JSON changes to an existing repo on disk.
@@ -755,15 +1417,51 @@ def do_apply_all_changes():
         messagebox.showerror("Error", f"The specified path is not a directory:\n{repo_path}")
         return
 
-    save_last_path(LAST_APPLY_PATH_FILE, repo_path)
+    # Atomic write (see atomic_write_text) on a background thread so the
+    # click handler never waits on disk latency.
+    threading.Thread(target=save_last_path,
+                     args=(LAST_APPLY_PATH_FILE, repo_path), daemon=True).start()
 
-    json_input = text_json.get("1.0", tk.END).strip()
+    # "end-1c" stops before the trailing newline Tk always appends,
+    # avoiding an extra copy of the full buffer just to strip it.
+    json_input = text_json.get("1.0", "end-1c").strip()
     if not json_input:
         messagebox.showwarning("No JSON", "Please paste JSON instructions for changes.")
         return
 
-    apply_all_changes(repo_path, json_input)
-    messagebox.showinfo("Done", "Code changes have been applied.")
+    _start_apply_worker(repo_path, json_input)
+
+def do_apply_changes_from_file():
+    """
+    Applies JSON changes read directly from a file on disk, bypassing
+    the Text widget entirely for very large changesets.
+    """
+    repo_path = apply_path_var.get().strip()
+    if not repo_path:
+        messagebox.showerror("Error", "No folder path provided for applying changes.")
+        return
+    if not os.path.isdir(repo_path):
+        messagebox.showerror("Error", f"The specified path is not a directory:\n{repo_path}")
+        return
+
+    json_path = filedialog.askopenfilename(
+        title="Select JSON changes file",
+        filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+    )
+    if not json_path:
+        return
+
+    threading.Thread(target=save_last_path,
+                     args=(LAST_APPLY_PATH_FILE, repo_path), daemon=True).start()
+
+    try:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            json_input = f.read()
+    except Exception as e:
+        messagebox.showerror("Error", f"Could not read JSON file:\n{e}")
+        return
+
+    _start_apply_worker(repo_path, json_input)
 
 # -------------------------- GUI Setup --------------------------
 root = tk.Tk()
@@ -788,7 +1486,8 @@ combine_btn.pack(side=tk.LEFT, padx=5)
 frame_prompt = tk.LabelFrame(root, text="User Prompt")
 frame_prompt.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
-user_prompt_var = tk.Text(frame_prompt, wrap=tk.WORD, height=5)
+user_prompt_var = tk.Text(frame_prompt, wrap=tk.WORD, height=5,
+                          undo=False, maxundo=0, autoseparators=False)
 user_prompt_var.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
 # -------- Provider Selection (OpenAI vs. Deepseek vs. Anthropic vs. Ollama) --------
@@ -802,13 +1501,39 @@ tk.Radiobutton(frame_provider, text="Anthropic", variable=api_provider_var, valu
 tk.Radiobutton(frame_provider, text="Ollama", variable=api_provider_var, value="ollama").pack(side=tk.LEFT)
 
 # -------- Model selection dropdown (updates depending on provider) --------
+# The OpenAI listing requires a network round trip, so the dropdown is
+# seeded from the last cached listing immediately and refreshed once in
+# the background; the refresh rebuilds the menu via root.after when done.
+_openai_models = None
+_openai_models_refresh_started = False
+
+def _refresh_openai_models():
+    global _openai_models
+    models = get_available_models_openai()
+    _openai_models = models
+    try:
+        atomic_write_text(OPENAI_MODELS_CACHE_FILE, json.dumps(models))
+    except Exception as e:
+        print(f"[DEBUG] Failed to save model list cache: {e}")
+    root.after(0, _on_models_refreshed)
+
+def _on_models_refreshed():
+    if api_provider_var.get() == "openai":
+        update_models()
+
 def update_models(*args):
+    global _openai_models, _openai_models_refresh_started
     provider = api_provider_var.get()
     model_menu = model_dropdown['menu']
     model_menu.delete(0, 'end')
-    
+
     if provider == "openai":
-        models = get_available_models_openai()
+        if _openai_models is None:
+            _openai_models = load_repo_list(OPENAI_MODELS_CACHE_FILE) or list(OPENAI_PRIORITY_MODELS)
+        if not _openai_models_refresh_started:
+            _openai_models_refresh_started = True
+            threading.Thread(target=_refresh_openai_models, daemon=True).start()
+        models = _openai_models
         if not models:
             models = ["gpt-3.5-turbo"]  # Fallback
     elif provider == "deepseek":
@@ -820,8 +1545,10 @@ def update_models(*args):
     else:
         models = []
     
+    # add_radiobutton binds the variable directly, avoiding one Python
+    # callback object per entry via tk._setit.
     for m in models:
-        model_menu.add_command(label=m, command=tk._setit(selected_model_var, m))
+        model_menu.add_radiobutton(label=m, variable=selected_model_var, value=m)
     # Set the first model in the updated list
     if models:
         selected_model_var.set(models[0])
@@ -834,9 +1561,13 @@ model_dropdown.pack(pady=5)
 
 # Whenever the radio-button changes, refresh the model list
 api_provider_var.trace("w", update_models)
-update_models()  # Populate once
+# Populate once after the first paint instead of blocking widget setup
+root.after_idle(update_models)
 
 # -------- Button to Send to API --------
+force_refresh_var = tk.BooleanVar(value=False)
+tk.Checkbutton(root, text="Force refresh (skip response cache)",
+               variable=force_refresh_var).pack()
 send_btn = tk.Button(root, text="Send to API", command=send_to_api)
 send_btn.pack(pady=10)
 
@@ -856,10 +1587,16 @@ browse_btn2.pack(side=tk.LEFT, padx=5)
 
 tk.Label(frame_apply, text="Paste JSON changes here:").pack(anchor=tk.W, padx=5)
 
-text_json = tk.Text(frame_apply, wrap=tk.NONE, width=80, height=10)
+# Undo is disabled so Tk doesn't record an O(bytes) undo stack when
+# multi-MB JSON is pasted in.
+text_json = tk.Text(frame_apply, wrap=tk.NONE, width=80, height=10,
+                    undo=False, maxundo=0, autoseparators=False)
 text_json.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
 apply_btn = tk.Button(frame_apply, text="Apply Changes", command=do_apply_all_changes)
 apply_btn.pack(side=tk.BOTTOM, pady=5)
 
+apply_file_btn = tk.Button(frame_apply, text="Apply From File...", command=do_apply_changes_from_file)
+apply_file_btn.pack(side=tk.BOTTOM, pady=2)
+
 root.mainloop()